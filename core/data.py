@@ -1,9 +1,16 @@
+import asyncio
 import datetime
-import json
+import functools
+import sys
 from dataclasses import asdict, dataclass
 from pathlib import Path
+from types import MappingProxyType
 from typing import Literal, Union
 
+from astrbot.api import logger
+
+from .utils import json_dumps, json_loads
+
 # =========================
 # 类型定义
 # =========================
@@ -11,6 +18,7 @@ from typing import Literal, Union
 ScheduleStatus = Literal["ok", "failed"]
 
 DateLike = Union[  # noqa: UP007
+    str,  # yyyy-mm-dd
     datetime.datetime,
     datetime.date,
     int,  # timestamp
@@ -23,14 +31,22 @@ DateLike = Union[  # noqa: UP007
 # =========================
 
 
+@functools.lru_cache(maxsize=4096)
+def _to_date_str_hashable(value: datetime.date | int | float) -> str:
+    """date / 时间戳的归一化结果缓存（datetime 可能带时区，相等不代表同一天，不走缓存）"""
+    if isinstance(value, datetime.date):
+        return sys.intern(value.isoformat())
+    return sys.intern(datetime.datetime.fromtimestamp(value).date().isoformat())
+
+
 def to_date_str(value: DateLike) -> str:
     """统一将时间输入转为 yyyy-mm-dd 字符串"""
+    if isinstance(value, str):
+        return sys.intern(value)
     if isinstance(value, datetime.datetime):
-        return value.date().isoformat()
-    if isinstance(value, datetime.date):
-        return value.isoformat()
-    if isinstance(value, int | float):
-        return datetime.datetime.fromtimestamp(value).date().isoformat()
+        return sys.intern(f"{value.year:04d}-{value.month:02d}-{value.day:02d}")
+    if isinstance(value, datetime.date | int | float):
+        return _to_date_str_hashable(value)
     raise TypeError(f"Unsupported date type: {type(value)}")
 
 
@@ -48,6 +64,10 @@ class ScheduleData:
     schedule: str = ""
     status: ScheduleStatus = "ok"
 
+    def __post_init__(self):
+        # 日期 key 反复用于字典查找，驻留后可走指针比较
+        self.date = sys.intern(str(self.date))
+
     @classmethod
     def from_dict(cls, data: dict) -> "ScheduleData":
         """允许未来字段扩展"""
@@ -68,12 +88,19 @@ class ScheduleDataManager:
     """
     纯数据层：
     - 内存存取
-    - JSON 持久化
+    - JSON 持久化（开启自动落盘后合并写入）
     """
 
     def __init__(self, json_path: Path):
         self._path = json_path
         self._data: dict[str, ScheduleData] = {}
+        self._view = MappingProxyType(self._data)
+        # 内存数据每次变化时递增，供上层判断缓存是否过期
+        self._version = 0
+
+        self._dirty = False
+        self._flush_task: asyncio.Task | None = None
+        self._write_lock = asyncio.Lock()
 
         self.load()
 
@@ -87,59 +114,140 @@ class ScheduleDataManager:
 
     def set(self, data: ScheduleData) -> None:
         self._data[data.date] = data
-        self.save()
+        self._version += 1
+        self._mark_dirty()
 
     def remove(self, date: DateLike) -> None:
         if self._data.pop(to_date_str(date), None):
-            self.save()
+            self._version += 1
+            self._mark_dirty()
+
+    @property
+    def version(self) -> int:
+        """数据版本号，任何增删改或重新加载后都会变化"""
+        return self._version
+
+    def all(self) -> MappingProxyType[str, ScheduleData]:
+        """返回只读视图，防止外部污染"""
+        return self._view
 
-    def all(self) -> dict[str, ScheduleData]:
-        """返回副本，防止外部污染"""
+    def copy(self) -> dict[str, ScheduleData]:
+        """返回可修改的副本"""
         return dict(self._data)
 
     # ---------- JSON 持久化 ----------
 
     def load(self) -> None:
         """从 JSON 加载（文件不存在则视为空）"""
+        self._apply(self._read_raw())
+
+    async def reload(self) -> None:
+        """
+        异步重新加载，文件读取与解析放到线程中，避免阻塞事件循环。
+        以磁盘文件为准：尚未落盘的修改会被丢弃。
+        """
+        async with self._write_lock:
+            raw = await asyncio.to_thread(self._read_raw)
+            self._apply(raw)
+            self._dirty = False
+
+    def _read_raw(self) -> dict | None:
         if not self._path.exists():
-            self._data.clear()
-            return
+            return None
 
         try:
-            raw = json.loads(self._path.read_text(encoding="utf-8"))
+            raw = json_loads(self._path.read_bytes())
         except Exception:
             # 文件损坏时直接清空，交给上层兜底
-            self._data.clear()
-            return
+            return None
+        return raw if isinstance(raw, dict) else None
 
+    def _apply(self, raw: dict | None) -> None:
         data: dict[str, ScheduleData] = {}
-        for date_str, item in raw.items():
+        for date_str, item in (raw or {}).items():
             if not isinstance(item, dict):
                 continue
             try:
-                data[date_str] = ScheduleData.from_dict(item)
+                data[sys.intern(str(date_str))] = ScheduleData.from_dict(item)
             except Exception:
                 continue
 
-        self._data = data
+        # 原地替换，保持只读视图有效
+        self._data.clear()
+        self._data.update(data)
+        self._version += 1
 
     def save(self) -> None:
         """保存为 JSON（原子写）"""
-        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._write(self._dump())
 
-        tmp_path = self._path.with_suffix(".tmp")
+    def _dump(self) -> bytes:
         payload = {date: asdict(data) for date, data in self._data.items()}
+        return json_dumps(payload, indent=True)
 
-        tmp_path.write_text(
-            json.dumps(payload, ensure_ascii=False, indent=2),
-            encoding="utf-8",
-        )
+    def _write(self, content: bytes) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_bytes(content)
         tmp_path.replace(self._path)
 
+    # ---------- 合并写入 ----------
+
+    def start_autoflush(self, interval: float = 2.0) -> None:
+        """开启后台落盘：修改只标记脏位，每隔 interval 秒统一写一次"""
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_loop(interval))
+
+    async def close(self) -> None:
+        """停止后台落盘，并写入尚未保存的修改"""
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """有未保存的修改时立即写入（序列化在事件循环内完成，文件操作放到线程中）"""
+        async with self._write_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            content = self._dump()
+            try:
+                await asyncio.to_thread(self._write, content)
+            except BaseException:
+                # 写失败时保留脏位，下次重试
+                self._dirty = True
+                raise
+
+    def _mark_dirty(self) -> None:
+        if self._flush_task is None:
+            # 未开启自动落盘时保持即时写入
+            self.save()
+        else:
+            self._dirty = True
+
+    async def _flush_loop(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                # 被取消时让进行中的写入完成，close() 会等待写锁
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # 脏位已在 flush 中保留，下一轮重试
+                logger.error(f"日程数据保存失败: {e}")
+
     # ---------- 工具方法 ----------
 
     def clear(self, *, save: bool = True) -> None:
         """清空所有数据"""
         self._data.clear()
+        self._version += 1
         if save:
-            self.save()
+            self._mark_dirty()
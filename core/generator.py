@@ -1,15 +1,18 @@
 import asyncio
 import datetime
+import functools
 import json
 import random
 import re
-from dataclasses import asdict, dataclass
+import string
+from dataclasses import asdict, dataclass, fields
 
 from astrbot.api import logger
 from astrbot.core.config.astrbot_config import AstrBotConfig
 from astrbot.core.star.context import Context
 
-from .data import ScheduleData, ScheduleDataManager
+from .data import ScheduleData, ScheduleDataManager, to_date_str
+from .utils import json_loads
 
 
 @dataclass(slots=True)
@@ -26,6 +29,50 @@ class ScheduleContext:
     schedule_type: str
 
 
+# LLM 输出中包裹 JSON 的代码块标记
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|```\s*$", re.MULTILINE)
+
+_JSON_DECODER = json.JSONDecoder()
+
+_WEEKDAYS = ("星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日")
+
+_FORMATTER = string.Formatter()
+
+# 字段名中属性/下标访问的起始位置，如 x.attr、x[0]
+_FIELD_ACCESS_RE = re.compile(r"[.\[]")
+
+_CONTEXT_FIELDS = frozenset(f.name for f in fields(ScheduleContext))
+
+
+def _template_fields(template: str) -> set[str]:
+    """prompt 模板引用的字段名（支持 {x:...}、{x!s}、{x.attr} 以及嵌套格式说明）"""
+    names: set[str] = set()
+    for _, field_name, format_spec, _ in _FORMATTER.parse(template):
+        if field_name:
+            names.add(_FIELD_ACCESS_RE.split(field_name, maxsplit=1)[0])
+        if format_spec:
+            names |= _template_fields(format_spec)
+    return names
+
+
+@functools.lru_cache(maxsize=1)
+def _cn_holidays():
+    """中国节假日表，进程内只构建一次"""
+    try:
+        import holidays
+    except ImportError:
+        return None
+    return holidays.country_holidays("CN")
+
+
+@functools.lru_cache(maxsize=512)
+def _holiday_name(date: datetime.date) -> str:
+    cn_holidays = _cn_holidays()
+    if cn_holidays is None:
+        return ""
+    return cn_holidays.get(date) or ""
+
+
 class SchedulerGenerator:
     def __init__(
         self,
@@ -37,20 +84,25 @@ class SchedulerGenerator:
         self.config = config
         self.data_mgr = data_mgr
 
-        self._gen_lock = asyncio.Lock()
+        # 检查与置位之间没有 await，单线程事件循环下无需加锁
         self._generating = False
 
+        # ((umo, cid, count, 原始历史), 格式化结果)，只保留最近一次，避免常驻多份历史
+        self._chats_cache: tuple[tuple[str, str, int, str], str] | None = None
+        # 模板解析结果（模板文本、引用字段、缺失字段），见 _refresh_template
+        self._tmpl_text: str | None = None
+        self._tmpl_vars: frozenset[str] = frozenset()
+        self._tmpl_missing: frozenset[str] = frozenset()
+
     async def generate_schedule(
         self, date: datetime.datetime | None = None, umo: str | None = None
     ) -> ScheduleData:
-        async with self._gen_lock:
-            if self._generating:
-                raise RuntimeError("schedule_generating")
-            self._generating = True
+        if self._generating:
+            raise RuntimeError("schedule_generating")
+        self._generating = True
 
-        data: ScheduleData | None = None
         date = date or datetime.datetime.now()
-        date_str = date.strftime("%Y-%m-%d")
+        date_str = to_date_str(date)
         try:
             logger.info(f"正在生成 {date_str} 的日程...")
             ctx = await self._collect_context(date, umo)
@@ -68,43 +120,42 @@ class SchedulerGenerator:
                 date=date_str, outfit="生成失败", schedule="生成失败", status="failed"
             )
         finally:
-            async with self._gen_lock:
-                self._generating = False
-            if data:
-                self.data_mgr.set(data)
+            self._generating = False
 
     # ---------- context ----------
 
     async def _collect_context(
         self, data: datetime.datetime, umo: str | None
     ) -> ScheduleContext:
+        self._refresh_template()
+        if "recent_chats" in self._tmpl_vars:
+            # 人设与聊天记录互不依赖，并发获取
+            persona_desc, recent_chats = await asyncio.gather(
+                self._get_persona(), self._get_recent_chats(umo)
+            )
+        else:
+            # 模板不引用聊天记录时跳过获取
+            persona_desc, recent_chats = await self._get_persona(), ""
         return ScheduleContext(
-            date_str=data.strftime("%Y年%m月%d日"),
+            date_str=f"{data.year}年{data.month:02d}月{data.day:02d}日",
             weekday=self._weekday(data),
             holiday=self._get_holiday_info(data.date()),
-            persona_desc=await self._get_persona(),
+            persona_desc=persona_desc,
             history_schedules=self._get_history(data),
-            recent_chats=await self._get_recent_chats(umo),
+            recent_chats=recent_chats,
             **self._pick_diversity(),
         )
 
     def _weekday(self, data):
-        return ["星期一", "星期二", "星期三", "星期四", "星期五", "星期六", "星期日"][
-            data.weekday()
-        ]
+        return _WEEKDAYS[data.weekday()]
 
     def _get_holiday_info(self, date: datetime.date) -> str:
         """获取节日信息（中国）"""
         try:
-            import holidays
-
-            cn_holidays = holidays.CN()
-            holiday_name = cn_holidays.get(date)
-            if holiday_name:
-                return f"今天是 {holiday_name}"
+            holiday_name = _holiday_name(date)
         except Exception:
             return ""
-        return ""
+        return f"今天是 {holiday_name}" if holiday_name else ""
 
     def _pick_diversity(self) -> dict:
         pool = self.config["pool"]
@@ -132,7 +183,7 @@ class SchedulerGenerator:
             schedule = data.schedule[:60]
 
             items.append(
-                f"[{date.strftime('%Y-%m-%d')}] 穿搭：{outfit} 日程：{schedule}"
+                f"[{to_date_str(date)}] 穿搭：{outfit} 日程：{schedule}"
             )
 
         return "\n".join(items) if items else "（无历史记录）"
@@ -155,7 +206,13 @@ class SchedulerGenerator:
             if not conv or not conv.history:
                 return "无最近对话记录"
 
-            history = json.loads(conv.history)
+            # 直接比较原始历史字符串（同一对象时走指针比较），比重新解析便宜
+            key = (umo, cid, count, conv.history)
+            cached = self._chats_cache
+            if cached and cached[0] == key:
+                return cached[1]
+
+            history = json_loads(conv.history)
 
             recent = history[-count:] if count > 0 else []
 
@@ -168,7 +225,9 @@ class SchedulerGenerator:
                 elif role == "assistant":
                     formatted.append(f"我: {content}")
 
-            return "\n".join(formatted)
+            result = "\n".join(formatted)
+            self._chats_cache = (key, result)
+            return result
 
         except Exception as e:
             logger.error(f"Failed to get recent chats for {umo}: {e}")
@@ -182,19 +241,26 @@ class SchedulerGenerator:
             return "你是一个热爱生活、情感细腻的AI伙伴。"
 
     # ---------- llm ----------
+    def _refresh_template(self) -> str:
+        """返回当前模板；模板文本变化时才重新扫描占位符"""
+        template = self.config["prompt_template"]
+        if template != self._tmpl_text:
+            self._tmpl_vars = frozenset(_template_fields(template))
+            self._tmpl_missing = self._tmpl_vars - _CONTEXT_FIELDS
+            if self._tmpl_missing:
+                logger.warning(
+                    f"prompt 模板存在 ScheduleContext 未提供的字段：{self._tmpl_missing}| 已自动替换成空串"
+                )
+            self._tmpl_text = template
+        return template
+
     def _build_prompt(self, ctx: ScheduleContext) -> str:
+        template = self._refresh_template()
         ctx_dict = asdict(ctx)  # 实际有的字段
-        tmpl_vars = set(re.findall(r"\{(\w+)\}", self.config["prompt_template"]))
-        missing = tmpl_vars - ctx_dict.keys()
-        if missing:
-            logger.warning(
-                f"prompt 模板存在 ScheduleContext 未提供的字段：{missing}| 已自动替换成空串"
-            )
-
         # 统一补空值，避免 KeyError
-        for k in missing:
+        for k in self._tmpl_missing:
             ctx_dict[k] = ""
-        return self.config["prompt_template"].format(**ctx_dict)
+        return template.format_map(ctx_dict)
 
     async def _call_llm(self, prompt: str) -> str:
         provider = self.context.get_using_provider()
@@ -218,45 +284,23 @@ class SchedulerGenerator:
 
     # ---------- parse ----------
     def _parse_result(self, text: str, date_str: str) -> ScheduleData:
-        text = text.strip()
-        text = re.sub(r"^```json\s*", "", text, flags=re.MULTILINE)
-        text = re.sub(r"^```\s*", "", text, flags=re.MULTILINE)
-        text = re.sub(r"```\s*$", "", text, flags=re.MULTILINE)
+        text = _FENCE_RE.sub("", text.strip())
 
         start = text.find("{")
         if start == -1:
             return ScheduleData(date=date_str, outfit="日常休闲装", schedule="无")
 
-        brace = 0
-        in_string = False
-        escape = False
-
-        for i, ch in enumerate(text[start:], start=start):
-            if in_string:
-                if escape:
-                    escape = False
-                elif ch == "\\":
-                    escape = True
-                elif ch == '"':
-                    in_string = False
-            else:
-                if ch == '"':
-                    in_string = True
-                elif ch == "{":
-                    brace += 1
-                elif ch == "}":
-                    brace -= 1
-                    if brace == 0:
-                        json_str = text[start : i + 1]
-                        try:
-                            data = json.loads(json_str)
-                            return ScheduleData(
-                                date=date_str,
-                                outfit=data.get("outfit", "日常休闲装"),
-                                schedule=data.get("schedule", "无"),
-                            )
-                        except Exception:
-                            break
+        # 只解码第一个顶层对象；失败时不再探测内层 "{"，整段文本作为日程
+        try:
+            data, _ = _JSON_DECODER.raw_decode(text, start)
+        except json.JSONDecodeError:
+            data = None
+        if isinstance(data, dict):
+            return ScheduleData(
+                date=date_str,
+                outfit=data.get("outfit", "日常休闲装"),
+                schedule=data.get("schedule", "无"),
+            )
 
         return ScheduleData(
             date=date_str,
@@ -34,11 +34,14 @@ class LifeScheduler:
             },
         )
         self.job = None
+        # 当前生效的 (时, 分)，设定时解析一次
+        self._hm: tuple[int, int] | None = None
 
     def start(self):
         try:
             schedule_time = self.config["schedule_time"]
-            hour, minute = map(int, schedule_time.split(":"))
+            hour, minute = self._parse_hm(schedule_time)
+            self._hm = (hour, minute)
             self.job = self.scheduler.add_job(
                 self.task,
                 "cron",
@@ -51,6 +54,11 @@ class LifeScheduler:
         except Exception as e:
             logger.error(f"调度器初始化失败：{e}")
 
+    @staticmethod
+    def _parse_hm(value: str) -> tuple[int, int]:
+        hour, minute = map(int, value.split(":"))
+        return hour, minute
+
     def stop(self):
         if self.scheduler.running:
             self.scheduler.shutdown()
@@ -60,11 +68,12 @@ class LifeScheduler:
             return
 
         try:
-            hour, minute = map(int, new_time.split(":"))
+            hour, minute = self._parse_hm(new_time)
             self.config["schedule_time"] = new_time
             self.config.save_config()
-            if self.job:
+            if self.job and (hour, minute) != self._hm:
                 self.job.reschedule("cron", hour=hour, minute=minute)
-                logger.info(f"生活调度器已重新排程至 {hour}:{minute}")
+                logger.info(f"生活调度器已重新排程至 {hour:02d}:{minute:02d}")
+            self._hm = (hour, minute)
         except Exception as e:
             logger.error(f"更新调度器失败：{e}")
@@ -1,26 +1,42 @@
-
 import datetime
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时回退到标准库
+    orjson = None
+
+_now = datetime.datetime.now
+
+# 每个小时对应的中文时段
+_HOUR_DESC = tuple(
+    ["深夜"] * 6
+    + ["清晨"] * 3
+    + ["上午"] * 3
+    + ["中午"] * 2
+    + ["下午"] * 4
+    + ["晚上"] * 4
+    + ["深夜"] * 2
+)
 
 
 def time_desc(h=None):
     """返回中文时段：深夜/清晨/上午/中午/下午/晚上"""
-    h = (h or datetime.datetime.now().hour) % 24
-    return (
-        "深夜"
-        if h < 6
-        else "清晨"
-        if h < 9
-        else "上午"
-        if h < 12
-        else "中午"
-        if h < 14
-        else "下午"
-        if h < 18
-        else "晚上"
-        if h < 22
-        else "深夜"
-    )
+    return _HOUR_DESC[(h if h is not None else _now().hour) % 24]
 
 
+def json_loads(data: str | bytes) -> Any:
+    """解析 JSON，优先使用 orjson"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
 
 
+def json_dumps(obj: Any, *, indent: bool = False) -> bytes:
+    """序列化为 UTF-8 JSON 字节串（不转义非 ASCII），优先使用 orjson"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None).encode(
+        "utf-8"
+    )
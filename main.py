@@ -1,5 +1,7 @@
 import datetime
 import re
+import sys
+import time
 
 from astrbot.api import logger
 from astrbot.api.all import Context, Star
@@ -13,6 +15,9 @@ from .core.generator import SchedulerGenerator
 from .core.schedule import LifeScheduler
 from .core.utils import time_desc
 
+# 支持 1~2 位小时、1~2 位分钟，中间用冒号分隔
+_HHMM_RE = re.compile(r"^\d{1,2}:\d{1,2}$")
+
 
 class LifeSchedulerPlugin(Star):
     def __init__(self, context: Context, config: AstrBotConfig):
@@ -21,9 +26,15 @@ class LifeSchedulerPlugin(Star):
         self.config = config
         self.data_dir = StarTools.get_data_dir()
         self.schedule_data_file = self.data_dir / "schedule_data.json"
+        # (失效时间戳, yyyy-mm-dd)，跨过本地零点后重建
+        self._today_cache: tuple[float, str] = (0.0, "")
+        # 注入文本（不含时间感知）对应的 (日期, 数据版本)，日程数据变化后失效
+        self._last_injected_key: tuple[str, int] | None = None
+        self._last_inject_text = ""
 
     async def initialize(self):
         self.data_mgr = ScheduleDataManager(self.schedule_data_file)
+        self.data_mgr.start_autoflush()
         self.generator = SchedulerGenerator(self.context, self.config, self.data_mgr)
         self.scheduler = LifeScheduler(
             context=self.context,
@@ -35,26 +46,40 @@ class LifeSchedulerPlugin(Star):
     async def terminate(self):
         """插件卸载时清理"""
         self.scheduler.stop()
+        await self.data_mgr.close()
+
+    def _today_str(self) -> str:
+        """今日日期字符串 yyyy-mm-dd，按本地零点缓存"""
+        expires_at, today_str = self._today_cache
+        if time.time() < expires_at:
+            return today_str
+        today = datetime.date.today()
+        tomorrow = datetime.datetime.combine(
+            today + datetime.timedelta(days=1), datetime.time()
+        )
+        today_str = sys.intern(f"{today.year:04d}-{today.month:02d}-{today.day:02d}")
+        self._today_cache = (tomorrow.timestamp(), today_str)
+        return today_str
 
     @filter.on_llm_request()
     async def on_llm_request(self, event: AstrMessageEvent, req: ProviderRequest):
         """System Prompt 注入"""
-        today = datetime.datetime.now()
-        umo = event.unified_msg_origin
-        data = self.data_mgr.get(today)
-        if not data:
-            try:
-                data = await self.generator.generate_schedule(today, umo)
-            except RuntimeError:
-                return
-        if data.status == "failed":
+        if req.session_id == "life_scheduler_gen":
             return
 
-        # 使用更隐晦的方式注入，强调这是内心状态而非需要表达的信息
-        inject_text = f"""
-
-[内在状态 - 仅供理解角色当前心境，无需在对话中提及]
-时间感知：{time_desc()}
+        today_str = self._today_str()
+        if self._last_injected_key != (today_str, self.data_mgr.version):
+            data = self.data_mgr.get(today_str)
+            if not data:
+                try:
+                    data = await self.generator.generate_schedule(
+                        datetime.datetime.now(), event.unified_msg_origin
+                    )
+                except RuntimeError:
+                    return
+            if data.status == "failed":
+                return
+            self._last_inject_text = f"""
 穿着状态：{data.outfit}
 当日背景：{data.schedule}
 
@@ -63,6 +88,13 @@ class LifeSchedulerPlugin(Star):
 - 像真人一样自然对话，不解释自己在做什么、穿什么、在哪里
 - 只有当用户明确问起时，才简短回应相关问题
 - 上述内在状态只影响你的语气和情绪色彩，不作为对话内容"""
+            self._last_injected_key = (today_str, self.data_mgr.version)
+
+        # 使用更隐晦的方式注入，强调这是内心状态而非需要表达的信息
+        inject_text = f"""
+
+[内在状态 - 仅供理解角色当前心境，无需在对话中提及]
+时间感知：{time_desc()}{self._last_inject_text}"""
 
         req.system_prompt += inject_text
         logger.debug(f"[LLM] 添加的内在状态注入：{inject_text}")
@@ -70,15 +102,16 @@ class LifeSchedulerPlugin(Star):
     @filter.command("查看日程", alias={"life show"})
     async def life_show(self, event: AstrMessageEvent):
         """查看今日的日程"""
-        today = datetime.datetime.now()
-        today_str = today.strftime("%Y-%m-%d")
+        today_str = self._today_str()
         umo = event.unified_msg_origin
 
-        data = self.data_mgr.get(today)
+        data = self.data_mgr.get(today_str)
         if not data:
             try:
                 yield event.plain_result("今日还没日程，正在生成...")
-                data = await self.generator.generate_schedule(today, umo)
+                data = await self.generator.generate_schedule(
+                    datetime.datetime.now(), umo
+                )
             except RuntimeError:
                 yield event.plain_result("日程正在生成中，请稍后再查看")
                 return
@@ -90,12 +123,13 @@ class LifeSchedulerPlugin(Star):
     @filter.command("重写日程", alias={"life renew"})
     async def life_renew(self, event: AstrMessageEvent):
         """重写今日的日程"""
-        today = datetime.datetime.now()
-        today_str = today.strftime("%Y-%m-%d")
+        today_str = self._today_str()
         umo = event.unified_msg_origin
         yield event.plain_result("正在重写今日日程...")
         try:
-            data = await self.generator.generate_schedule(today, umo)
+            data = await self.generator.generate_schedule(
+                datetime.datetime.now(), umo
+            )
         except RuntimeError:
             yield event.plain_result("已有日程生成任务在进行中，请稍后再试")
             return
@@ -111,8 +145,7 @@ class LifeSchedulerPlugin(Star):
             yield event.plain_result("请提供时间，格式为 HH:MM，例如 /life time 07:30")
             return
 
-        # 支持 1~2 位小时、1~2 位分钟，中间用冒号分隔
-        if not re.match(r"^\d{1,2}:\d{1,2}$", param):
+        if not _HHMM_RE.match(param):
             yield event.plain_result("时间格式错误，请使用 HH:MM 格式")
             return
 